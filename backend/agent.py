@@ -1,14 +1,30 @@
 from langchain_core.messages import HumanMessage, SystemMessage
 from langgraph.graph import StateGraph, START, END
 from langchain_google_genai import ChatGoogleGenerativeAI
+from google.api_core.exceptions import ResourceExhausted
 from typing import TypedDict, Annotated, Sequence
+import asyncio
+import contextlib
+import functools
+import json
 import operator
 import os
 
+from llm_cache import CachedLLM
+
 # Define the state for the agent
 class AgentState(TypedDict):
     messages: Annotated[Sequence[HumanMessage | SystemMessage], operator.add]
     context: dict
+    context_str: str  # `context` serialised once by the caller, see serialize_context()
+
+def serialize_context(financial_context: dict) -> str:
+    """Stable JSON rendering of the financial context, computed once per agent run."""
+    return json.dumps(financial_context, sort_keys=True, default=str)
+
+@functools.lru_cache(maxsize=128)
+def _system_prompt(context_str: str) -> str:
+    return f"You are the FinCast AI Agent. You strictly analyze financial data for SMEs.\nContext: {context_str}"
 
 # Initialize Gemini Model via Langchain
 llm = ChatGoogleGenerativeAI(
@@ -20,18 +36,20 @@ llm = ChatGoogleGenerativeAI(
     # Make sure to set GOOGLE_API_KEY in your environment variables
 )
 
+cached_llm = CachedLLM(llm)
+
 # Define the core thinking node
 def think_node(state: AgentState):
     messages = state["messages"]
-    # Check if there's any financial context injected
-    financial_context = state.get("context", {})
+    # Check if there's any financial context injected — prefer the caller's pre-serialised copy
+    context_str = state.get("context_str")
+    if context_str is None:
+        context_str = serialize_context(state.get("context", {}))
     
     # We can inject context into the prompt dynamically
-    system_msg = SystemMessage(
-        content=f"You are the FinCast AI Agent. You strictly analyze financial data for SMEs.\nContext: {financial_context}"
-    )
+    system_msg = SystemMessage(content=_system_prompt(context_str))
     
-    response = llm.invoke([system_msg] + messages)
+    response = cached_llm.invoke([system_msg] + messages)
     return {"messages": [response]}
 
 # Build the LangGraph for the AI Agent Workflow
@@ -43,17 +61,65 @@ workflow.add_edge("think", END)
 # Compile the Graph
 fincast_agent = workflow.compile()
 
+# Process-wide cap on in-flight Gemini calls — tune to the provider quota tier
+AGENT_MAX_CONCURRENCY = int(os.getenv("FINCAST_MAX_CONCURRENCY", "8"))
+_agent_semaphore = asyncio.Semaphore(AGENT_MAX_CONCURRENCY)
+
+# Rate-limit (429) retries: exponential backoff of 1s, 2s, 4s ... capped at 16s
+RATE_LIMIT_ATTEMPTS = 4
+RATE_LIMIT_MAX_BACKOFF = 16
+
 async def run_fincast_agent(user_query: str, financial_context: dict = None):
     """
     Utility function to run the FinCast AI agent asynchronously.
     """
+    return await _run_agent(user_query, financial_context)
+
+
+async def _run_agent(user_query: str, financial_context: dict = None, batch_semaphore: asyncio.Semaphore = None):
+    """One agent call with 429 retries. The process-wide semaphore (and the caller's batch
+    semaphore, if any) is held only around the model call, never across a backoff sleep."""
     if financial_context is None:
         financial_context = {}
         
     initial_state = {
         "messages": [HumanMessage(content=user_query)],
-        "context": financial_context
+        "context": financial_context,
+        "context_str": serialize_context(financial_context)
     }
     
-    result = await fincast_agent.ainvoke(initial_state)
-    return result["messages"][-1].content
+    for attempt in range(RATE_LIMIT_ATTEMPTS):
+        try:
+            async with contextlib.AsyncExitStack() as slots:
+                # Batch slot first, then the shared one — the same order everywhere, so no deadlock
+                if batch_semaphore is not None:
+                    await slots.enter_async_context(batch_semaphore)
+                await slots.enter_async_context(_agent_semaphore)
+                result = await fincast_agent.ainvoke(initial_state)
+            return result["messages"][-1].content
+        except ResourceExhausted:
+            if attempt == RATE_LIMIT_ATTEMPTS - 1:
+                raise
+            # Back off outside the semaphores so the slots are free for other callers
+            await asyncio.sleep(min(RATE_LIMIT_MAX_BACKOFF, 2 ** attempt))
+
+
+async def run_fincast_agent_batch(queries: list[tuple[str, dict]], max_concurrency: int = None) -> list:
+    """
+    Run several (user_query, financial_context) pairs concurrently, e.g. a
+    sensitivity sweep across tax rates. Results come back in input order; a
+    failed query yields its exception rather than cancelling the rest of the batch.
+
+    Every call also goes through the process-wide AGENT_MAX_CONCURRENCY limit, so
+    `max_concurrency` can only lower it for this batch; the default (None) is just
+    the shared limit.
+    """
+    if max_concurrency is None or max_concurrency >= AGENT_MAX_CONCURRENCY:
+        batch_semaphore = None
+    else:
+        batch_semaphore = asyncio.Semaphore(max_concurrency)
+
+    return await asyncio.gather(
+        *(_run_agent(query, context, batch_semaphore) for query, context in queries),
+        return_exceptions=True
+    )
@@ -1,12 +1,36 @@
+import functools
+import inspect
 import numpy as np
 import pandas as pd
-from statsmodels.tsa.holtwinters import ExponentialSmoothing
-from sklearn.linear_model import LinearRegression
 import warnings
-from statsmodels.tools.sm_exceptions import ConvergenceWarning
 
-warnings.simplefilter('ignore', ConvergenceWarning)
-warnings.simplefilter('ignore', FutureWarning)
+# statsmodels (and the scipy stack under it) costs hundreds of ms and a lot of RSS to import, so it is loaded
+# on the first Holt-Winters fit rather than at server start.
+_ExponentialSmoothing = None
+
+
+def _silence_statsmodels_warnings():
+    """Hide statsmodels' convergence/future noise before statsmodels is imported (so it can't be
+    named by class yet); the loader adds the ConvergenceWarning category filter once it is."""
+    warnings.filterwarnings('ignore', message='Optimization failed to converge', module='statsmodels')
+    warnings.simplefilter('ignore', FutureWarning)
+
+
+_silence_statsmodels_warnings()
+
+
+def _load_forecasting_backend():
+    """Import statsmodels once, on the first Holt-Winters fit."""
+    global _ExponentialSmoothing
+    if _ExponentialSmoothing is None:
+        from statsmodels.tsa.holtwinters import ExponentialSmoothing
+        from statsmodels.tools.sm_exceptions import ConvergenceWarning
+        # statsmodels inserts its own "always" filter for ConvergenceWarning on import; go back in
+        # front of it, now matching the whole category rather than one message
+        _silence_statsmodels_warnings()
+        warnings.simplefilter('ignore', ConvergenceWarning)
+        _ExponentialSmoothing = ExponentialSmoothing
+    return _ExponentialSmoothing
 
 
 # ============================================================================
@@ -15,31 +39,40 @@ warnings.simplefilter('ignore', FutureWarning)
 
 def calculate_geometric_growth(data: list[float]) -> float:
     """Geometric Mean growth rate — correctly accounts for compounding & volatility drag."""
-    if len(data) < 2: return 0.0
-    sanitized = [d for d in data if d > 0]
-    if len(sanitized) < 2: return 0.0
-    product = 1.0
-    for i in range(1, len(sanitized)):
-        product *= sanitized[i] / sanitized[i-1]
-    return (product ** (1 / (len(sanitized) - 1))) - 1
+    sanitized = np.asarray(data, dtype=np.float64)
+    sanitized = sanitized[sanitized > 0]
+    if sanitized.size < 2: return 0.0
+    # The product of month-on-month ratios telescopes to last/first, so no per-month ratios are needed
+    return float((sanitized[-1] / sanitized[0]) ** (1 / (sanitized.size - 1))) - 1
 
 
 def countback_dso(ar_balance: float, historical_sales: list[float]) -> float:
-    """Countback (Exhaustion) Method for DSO — iterates backwards through monthly sales
+    """Countback (Exhaustion) Method for DSO — walks backwards through monthly sales
     to determine the exact number of days the current A/R balance represents.
     This is the CA-standard method, not the naive AR/Revenue*30 formula."""
-    remainder = ar_balance
-    total_dso = 0.0
     days_in_month = 30
-    for month_sales in historical_sales:
-        if remainder > month_sales:
-            total_dso += days_in_month
-            remainder -= month_sales
-        else:
-            ratio = remainder / month_sales if month_sales > 0 else 0
-            total_dso += ratio * days_in_month
-            break
-    return total_dso
+    sales = np.asarray(historical_sales, dtype=np.float64)
+    if np.any(sales < 0):
+        # Credit-note months make the running total non-monotonic, so searchsorted can't be used
+        remainder = ar_balance
+        total_dso = 0.0
+        for month_sales in sales:
+            if remainder > month_sales:
+                total_dso += days_in_month
+                remainder -= month_sales
+            else:
+                ratio = remainder / month_sales if month_sales > 0 else 0
+                total_dso += ratio * days_in_month
+                break
+        return float(total_dso)
+    cumulative = np.cumsum(sales)
+    # First month whose cumulative sales absorb the remaining A/R balance
+    k = int(np.searchsorted(cumulative, ar_balance, side='left'))
+    if k >= sales.size:
+        return float(days_in_month * sales.size)
+    remainder = ar_balance - (cumulative[k-1] if k > 0 else 0.0)
+    ratio = remainder / sales[k] if sales[k] > 0 else 0
+    return float(days_in_month * k + ratio * days_in_month)
 
 
 # ============================================================================
@@ -64,11 +97,39 @@ ADVANCE_TAX_SCHEDULE = {
     11: 0.25,   # March 15 — 25% incremental (cumulative 100%)
 }
 
+# Same schedule as parallel arrays, so installments are filled with one vectorised assignment
+ADVANCE_TAX_MONTH_IDX = np.array(list(ADVANCE_TAX_SCHEDULE.keys()), dtype=np.int64)
+ADVANCE_TAX_PCT = np.array(list(ADVANCE_TAX_SCHEDULE.values()), dtype=np.float64)
+
 # Indian FY month labels
 INDIAN_FY_MONTHS = ["Apr", "May", "Jun", "Jul", "Aug", "Sep",
                     "Oct", "Nov", "Dec", "Jan", "Feb", "Mar"]
 
 
+def advance_tax_schedule_array(
+    monthly_net_profits: np.ndarray,
+    tax_rate: float
+) -> np.ndarray:
+    """Array form of compute_advance_tax_schedule — returns a float64 ndarray of 12 outflows.
+    Use this directly from scenario / Monte Carlo loops to skip the list round-trip; a
+    (scenarios, 12) matrix of profits is scheduled in one call, one row per scenario."""
+    # Step 1: Estimate total annual taxable profit
+    estimated_annual_profit = np.asarray(monthly_net_profits, dtype=np.float64).sum(axis=-1)
+    
+    # Step 2: Compute total estimated annual tax liability
+    # If the business is projected to be loss-making, no advance tax is due
+    annual_tax_liability = np.where(estimated_annual_profit > 0, estimated_annual_profit * tax_rate, 0.0)
+    
+    # Step 3: If total tax < ₹10,000, advance tax is NOT mandatory (Section 208)
+    # However, the CA may still want to provision it. We provision it anyway
+    # but flag it in the model. For SMEs this threshold is important.
+    
+    # Step 4: Distribute tax across the 4 statutory installments
+    monthly_tax = np.zeros(annual_tax_liability.shape + (12,))
+    monthly_tax[..., ADVANCE_TAX_MONTH_IDX] = np.round(annual_tax_liability[..., None] * ADVANCE_TAX_PCT, 2)
+    return monthly_tax
+
+
 def compute_advance_tax_schedule(
     monthly_net_profits: list[float],
     tax_rate: float
@@ -84,71 +145,90 @@ def compute_advance_tax_schedule(
         June(M3), September(M6), December(M9), and March(M12).
         All other months have zero tax outflow.
     """
-    # Step 1: Estimate total annual taxable profit
-    estimated_annual_profit = sum(monthly_net_profits)
-    
-    # If the business is projected to be loss-making, no advance tax is due
-    if estimated_annual_profit <= 0:
-        return [0.0] * 12
-    
-    # Step 2: Compute total estimated annual tax liability
-    annual_tax_liability = estimated_annual_profit * tax_rate
-    
-    # Step 3: If total tax < ₹10,000, advance tax is NOT mandatory (Section 208)
-    # However, the CA may still want to provision it. We provision it anyway
-    # but flag it in the model. For SMEs this threshold is important.
-    
-    # Step 4: Distribute tax across the 4 statutory installments
-    monthly_tax = [0.0] * 12
-    for month_idx, pct in ADVANCE_TAX_SCHEDULE.items():
-        monthly_tax[month_idx] = round(annual_tax_liability * pct, 2)
-    
-    return monthly_tax
+    return advance_tax_schedule_array(monthly_net_profits, tax_rate).tolist()
 
 
 # ============================================================================
 # HBS FORECASTING METHODS — Adaptive for Short Time Series
 # ============================================================================
 
+def _make_key(data, *args) -> tuple:
+    return (tuple(round(float(x), 6) for x in data), *args)
+
+
+def _memoized_forecast(func):
+    """Memoise a pure forecast on its rounded history and parameters.
+
+    Scenario sweeps and UI re-renders repeat the same inputs, so warm calls skip
+    the fit. The cache holds tuples and every caller gets a fresh list back.
+    functools.lru_cache is already thread-safe; two concurrent misses just fit twice.
+    """
+    signature = inspect.signature(func)
+
+    @functools.lru_cache(maxsize=512)
+    def cached(data: tuple, *args) -> tuple:
+        return tuple(func(list(data), *args))
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        return list(cached(*_make_key(*bound.arguments.values())))
+
+    wrapper.cache_info = cached.cache_info
+    wrapper.cache_clear = cached.cache_clear
+    return wrapper
+
+
+@_memoized_forecast
 def straight_line_forecast(data: list[float], periods: int = 12) -> list[float]:
     """HBS Method 1 — Straight Line: Constant growth from geometric mean.
     Used for: Debt service, EMI, fixed costs that don't scale with revenue."""
     if len(data) < 2:
-        return [max(0, data[-1] if data else 0)] * periods
+        return [max(0, float(data[-1]) if len(data) else 0)] * periods
     growth = calculate_geometric_growth(data)
     growth = max(-0.15, min(0.15, growth))  # Cap to ±15% realistic bounds
     forecast = []
-    base = data[-1]
+    base = float(data[-1])
     for _ in range(periods):
         base *= (1 + growth)
         forecast.append(max(0, base))
     return forecast
 
 
+@_memoized_forecast
 def moving_average_forecast(data: list[float], window: int = 3, periods: int = 12) -> list[float]:
     """HBS Method 2 — Moving Average: Smooths short-term fluctuations."""
     if len(data) < window:
         return straight_line_forecast(data, periods)
-    history = list(data)
+    # Ring buffer of the trailing window with a running sum — O(periods) instead of O(periods·window)
+    buf = [float(v) for v in data[-window:]]
+    window_sum = sum(buf)
     forecast = []
-    for _ in range(periods):
-        nxt = sum(history[-window:]) / window
+    for i in range(periods):
+        nxt = window_sum / window
         forecast.append(max(0, nxt))
-        history.append(nxt)
+        window_sum += nxt - buf[i % window]
+        buf[i % window] = nxt
     return forecast
 
 
+@_memoized_forecast
 def simple_linear_regression(data: list[float], periods: int = 12) -> list[float]:
     """HBS Method 3 — Simple Linear Regression: Y = mX + b over time."""
     if len(data) < 3:
         return straight_line_forecast(data, periods)
-    X = np.arange(len(data)).reshape(-1, 1)
-    y = np.array(data)
-    model = LinearRegression().fit(X, y)
-    future_X = np.arange(len(data), len(data) + periods).reshape(-1, 1)
-    return [max(0, p) for p in model.predict(future_X).tolist()]
+    # Closed-form OLS on X = 0..n-1 — no need for a full sklearn estimator on one feature
+    n = len(data)
+    y = np.asarray(data, dtype=np.float64)
+    x = np.arange(n) - (n - 1) / 2
+    slope = np.dot(x, y - y.mean()) / np.dot(x, x)
+    intercept = y.mean() - slope * (n - 1) / 2
+    future_X = np.arange(n, n + periods)
+    return np.maximum(0, slope * future_X + intercept).tolist()
 
 
+@_memoized_forecast
 def adaptive_holt_winters_forecast(data: list[float], periods: int = 12) -> list[float]:
     """Adaptive Holt-Winters Exponential Smoothing.
     
@@ -178,6 +258,7 @@ def adaptive_holt_winters_forecast(data: list[float], periods: int = 12) -> list
     ts = pd.Series(data, dtype=float)
     
     try:
+        ExponentialSmoothing = _load_forecasting_backend()
         if n >= 24:
             # Full annual multiplicative seasonality (the gold standard)
             model = ExponentialSmoothing(
@@ -227,8 +308,8 @@ def multiple_linear_regression_forecast(data: list[float], periods: int = 12) ->
 def percent_of_sales(dependent_var_history: list[float], revenue_history: list[float]) -> float:
     """HBS Method 5 — Percent of Sales: Historical ratio of expense to revenue.
     Used for: COGS, OpEx, Payroll — expenses that scale proportionally with sales."""
-    total_rev = sum(revenue_history)
+    total_rev = float(np.sum(revenue_history))
     if total_rev == 0:
         return 0.0
-    return sum(dependent_var_history) / total_rev
+    return float(np.sum(dependent_var_history)) / total_rev
 
@@ -0,0 +1,45 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+
+class CachedLLM:
+    """
+    Response cache in front of the chat model. Dashboard users often re-ask the
+    same question while tweaking one assumption, so identical prompts (after
+    whitespace normalisation) are answered from memory for `ttl_seconds`.
+    The system message embeds the financial context, so any change to the
+    numbers produces a different key rather than a stale answer.
+
+    langgraph runs sync nodes on executor threads, so every read, insert and
+    eviction happens under one lock; the model call itself runs outside it.
+    """
+    def __init__(self, llm, ttl_seconds: float = 900, max_entries: int = 512, clock=time.monotonic):
+        self.llm = llm
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(messages) -> str:
+        # Whitespace only — case can carry meaning (tickers, context keys, quoted values)
+        normalised = "\x1f".join(" ".join(str(m.content).split()) for m in messages)
+        return hashlib.sha256(normalised.encode("utf-8")).hexdigest()
+
+    def invoke(self, messages):
+        key = self._key(messages)
+        with self._lock:
+            hit = self._entries.get(key)
+            if hit is not None and self._clock() - hit[0] < self.ttl_seconds:
+                self._entries.move_to_end(key)
+                return hit[1]
+        response = self.llm.invoke(messages)
+        with self._lock:
+            self._entries[key] = (self._clock(), response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return response
@@ -1,37 +1,92 @@
+import numpy as np
 import pandas as pd
+import csv
 import io
 import re
 
+_MONTH_RE = re.compile(r'(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec|\d{4}-\d{2})')
+_NUM_STRIP_RE = re.compile(r'[^\d\.\-]')
+
 def clean_numeric(val):
     if pd.isna(val):
         return 0.0
     if isinstance(val, (int, float)):
         return float(val)
     s = str(val).replace(',', '').replace('₹', '').replace('$', '').replace('€', '').strip()
-    s = re.sub(r'[^\d\.\-]', '', s)
+    s = _NUM_STRIP_RE.sub('', s)
     try:
         return float(s) if s else 0.0
     except ValueError:
         return 0.0
 
-def _get_mapped_column(columns, keywords):
-    for col in columns:
-        c_lower = str(col).lower()
-        if any(kw in c_lower for kw in keywords):
-            return col
+def _clean_col(col: pd.Series) -> pd.Series:
+    """Column-wise clean_numeric: cells pd.to_numeric already understands pass straight through,
+    only the leftovers get the vectorised regex strip; anything unparseable becomes 0.0."""
+    if pd.api.types.is_numeric_dtype(col):
+        return col.astype(float).fillna(0.0)
+    cleaned = pd.to_numeric(col, errors='coerce').astype(float)
+    # "inf"/"nan" text parses as a number but clean_numeric strips it to nothing — send it down the text path
+    cleaned[~np.isfinite(cleaned)] = np.nan
+    leftover = cleaned.isna() & col.notna()
+    cleaned[leftover] = pd.to_numeric(
+        col[leftover].astype(str).str.replace(_NUM_STRIP_RE, '', regex=True),
+        errors='coerce'
+    )
+    return cleaned.fillna(0.0)
+
+def _lowered_columns(columns):
+    """Pair each column with its lower-cased name once, so keyword lookups don't re-lower per call."""
+    return [(str(col).lower(), col) for col in columns]
+
+def _get_mapped_column(lowered_columns, keywords):
+    for c_lower, col in lowered_columns:
+        for kw in keywords:
+            if kw in c_lower:
+                return col
     return None
 
+# Sheets fully parsed before settling, and the month count that counts as "enough data"
+TOP_K_SHEETS = 2
+MIN_MONTHS = 3
+
+def _quick_score(preview) -> int:
+    """Count month-like tokens in a sheet preview — used to rank sheets before a full parse."""
+    return sum(1 for cell in np.ravel(preview.to_numpy()) if _MONTH_RE.search(str(cell).lower()))
+
+def _read_csv(file_bytes: bytes) -> pd.DataFrame:
+    # C tokenizer in one pass (low_memory=False skips chunked dtype inference on big files).
+    # It fixes the width from the first row, so ragged exports (notes trailing off to the right
+    # of the table) are re-read with the frame sized to the widest row.
+    try:
+        return pd.read_csv(io.BytesIO(file_bytes), header=None, low_memory=False)
+    except pd.errors.ParserError:
+        text = file_bytes.decode('utf-8', errors='replace')
+        width = max((len(row) for row in csv.reader(io.StringIO(text))), default=0)
+        return pd.read_csv(io.BytesIO(file_bytes), header=None, names=range(width), low_memory=False)
+
 def local_fallback_parse(file_bytes: bytes, filename: str) -> dict:
     if filename.endswith(".csv"):
-        df = pd.read_csv(io.BytesIO(file_bytes), header=None)
+        df = _read_csv(file_bytes)
         return _parse_dataframe(df, list(df.columns))
     else:
-        # Try all sheets and pick the one that yields the most data
+        # Rank sheets by a cheap month-token count on a 5-row preview, fully parse only the
+        # top few, and fall back to the rest only if none of those yields enough months.
+        # Sheets are parsed from the one open ExcelFile so the workbook is unzipped once.
         xls = pd.ExcelFile(io.BytesIO(file_bytes))
-        best_result = {"data": []}
+        scored = []
         for sheet in xls.sheet_names:
             try:
-                df = pd.read_excel(io.BytesIO(file_bytes), sheet_name=sheet, header=None)
+                scored.append((_quick_score(xls.parse(sheet_name=sheet, header=None, nrows=5)), sheet))
+            except Exception:
+                continue
+        scored.sort(key=lambda item: item[0], reverse=True)
+
+        best_result = {"data": [], "month": [], "columns": {}, "line_items": []}
+        for rank, (_, sheet) in enumerate(scored):
+            if rank >= TOP_K_SHEETS and len(best_result["data"]) >= MIN_MONTHS:
+                break
+            try:
+                df = xls.parse(sheet_name=sheet, header=None)
                 result = _parse_dataframe(df, list(df.columns))
                 if len(result["data"]) > len(best_result["data"]):
                     best_result = result
@@ -43,14 +98,14 @@ def local_fallback_parse(file_bytes: bytes, filename: str) -> dict:
 def _parse_dataframe(df, original_columns) -> dict:
 
     df = df.dropna(how='all', axis=0).dropna(how='all', axis=1).reset_index(drop=True)
-    df_str = df.astype(str).map(lambda x: str(x).lower().strip())
-
     # Detect horizontal (months in columns usually row 0 or 1)
     horizontal = False
     header_row_idx = 0
     
-    for r_idx, row in df_str.iterrows():
-        month_count = sum(1 for cell in row if re.search(r'(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec|\d{4}-\d{2})', cell))
+    # Lower-case row by row and stop at the first header match — the header sits near the top,
+    # so the rest of the sheet is never stringified. (The month search is unanchored, so no strip.)
+    for r_idx, row in enumerate(df.itertuples(index=False, name=None)):
+        month_count = sum(1 for cell in row if _MONTH_RE.search(str(cell).lower()))
         if month_count >= 3:
             header_row_idx = r_idx
             horizontal = True
@@ -67,78 +122,97 @@ def _parse_dataframe(df, original_columns) -> dict:
         df.columns = df.iloc[0]
         df = df.iloc[1:].reset_index(drop=True)
         # Dummy date column insertion if none exists
-        if not _get_mapped_column(list(df.columns), ['month', 'date', 'period']):
+        if not _get_mapped_column(_lowered_columns(df.columns), ['month', 'date', 'period']):
             df.insert(0, 'month_col', df.index)
 
     # Zoho & Tally Advanced Parameters mapping
     columns = list(df.columns)
+    lowered = _lowered_columns(columns)
     
     # 1. Inflows & Revenue
-    rev_col = _get_mapped_column(columns, ['revenue', 'sales', 'turnover', 'income', 'receipts', 'inflow', 'cash in'])
+    rev_col = _get_mapped_column(lowered, ['revenue', 'sales', 'turnover', 'income', 'receipts', 'inflow', 'cash in'])
     
     # 2. Outflows & Liabilities
-    cogs_col = _get_mapped_column(columns, ['cogs', 'cost of goods', 'cost of sales', 'direct cost', 'direct expense', 'purchases', 'material'])
-    opex_col = _get_mapped_column(columns, ['opex', 'operating', 'expenses', 'indirect', 'admin', 'overhead', 'outflow', 'cash out', 'payment'])
-    payroll_col = _get_mapped_column(columns, ['salary', 'payroll', 'wages', 'employee', 'pf', 'esi', 'labour'])
-    debt_col = _get_mapped_column(columns, ['loan', 'debt', 'emi', 'interest', 'liabilities', 'borrowings'])
-    invest_col = _get_mapped_column(columns, ['investment', 'capex', 'fixed asset', 'capital'])
+    cogs_col = _get_mapped_column(lowered, ['cogs', 'cost of goods', 'cost of sales', 'direct cost', 'direct expense', 'purchases', 'material'])
+    opex_col = _get_mapped_column(lowered, ['opex', 'operating', 'expenses', 'indirect', 'admin', 'overhead', 'outflow', 'cash out', 'payment'])
+    payroll_col = _get_mapped_column(lowered, ['salary', 'payroll', 'wages', 'employee', 'pf', 'esi', 'labour'])
+    debt_col = _get_mapped_column(lowered, ['loan', 'debt', 'emi', 'interest', 'liabilities', 'borrowings'])
+    invest_col = _get_mapped_column(lowered, ['investment', 'capex', 'fixed asset', 'capital'])
     
     # 3. Liquidity & Working Capital
-    ar_col = _get_mapped_column(columns, ['receivable', 'debtor', 'a/r', 'sundry debtor'])
-    ap_col = _get_mapped_column(columns, ['payable', 'creditor', 'a/p'])
-    cash_col = _get_mapped_column(columns, ['cash', 'bank', 'closing balance', 'liquidity', 'balance'])
+    ar_col = _get_mapped_column(lowered, ['receivable', 'debtor', 'a/r', 'sundry debtor'])
+    ap_col = _get_mapped_column(lowered, ['payable', 'creditor', 'a/p'])
+    cash_col = _get_mapped_column(lowered, ['cash', 'bank', 'closing balance', 'liquidity', 'balance'])
     
-    date_col = _get_mapped_column(columns, ['month', 'date', 'period']) or 'month_col'
-
-    extracted_data = []
+    date_col = _get_mapped_column(lowered, ['month', 'date', 'period']) or 'month_col'
 
     mapped_cols = {rev_col, cogs_col, opex_col, payroll_col, debt_col, invest_col, ar_col, ap_col, cash_col, date_col}
     unmapped_cols = [c for c in columns if c not in mapped_cols and str(c).strip() != '']
 
-    for idx, row in df.iterrows():
-        # Validate row has at least some data
-        if pd.isna(row.get(rev_col)) and pd.isna(row.get(opex_col)) and pd.isna(row.get(cash_col)):
-            continue
-            
-        rev_val = clean_numeric(row.get(rev_col)) if rev_col else 0.0
-        cogs_val = clean_numeric(row.get(cogs_col)) if cogs_col else 0.0
-        opex_val = clean_numeric(row.get(opex_col)) if opex_col else 0.0
-        payroll_val = clean_numeric(row.get(payroll_col)) if payroll_col else 0.0
-        debt_val = clean_numeric(row.get(debt_col)) if debt_col else 0.0
-        invest_val = clean_numeric(row.get(invest_col)) if invest_col else 0.0
-        ar_val = clean_numeric(row.get(ar_col)) if ar_col else 0.0
-        ap_val = clean_numeric(row.get(ap_col)) if ap_col else 0.0
-        cash_val = clean_numeric(row.get(cash_col)) if cash_col else 0.0
-        
-        month_val = str(row.get(date_col, f"M{idx+1}")).strip()
-
-        # Skip total rows
-        if 'total' in month_val.lower() or (rev_val == 0.0 and opex_val == 0.0 and cash_val == 0.0):
-            continue
-
-        # Extract granular line items
-        line_items = {}
-        for col in unmapped_cols:
-            val = clean_numeric(row.get(col))
-            if val != 0.0:
-                # Keep exact column name but title case it for neatness
-                clean_name = str(col).strip().title()
-                line_items[clean_name] = abs(val)
-
-        extracted_data.append({
-            "month": month_val,
-            "revenue": abs(rev_val),
-            "cogs": abs(cogs_val),
-            "payroll": abs(payroll_val),
-             # To prevent double-counting if file has both generic 'expenses' and 'payroll', we don't assume. 
-             # We just present them raw.
-            "opex": abs(opex_val), 
-            "debt_service": abs(debt_val),
-            "capex": abs(invest_val),
-            "ar_balance": abs(ar_val),
-            "ap_balance": abs(ap_val),
-            "cash_balance": cash_val,
-            "line_items": line_items
-        })
-
-    return {"data": extracted_data}
+    def raw_column(col):
+        # First occurrence by position, so duplicate header names can't yield a DataFrame
+        if col is None:
+            return pd.Series(np.nan, index=df.index)
+        return df.iloc[:, columns.index(col)]
+
+    def numeric_column(col, signed=False):
+        # Absolute values are taken once per column; only cash balance keeps its sign
+        if not col:
+            return np.zeros(len(df))
+        cleaned = _clean_col(raw_column(col))
+        return (cleaned if signed else cleaned.abs()).to_numpy()
+
+    # Validate row has at least some data — one vectorised mask instead of per-row checks
+    has_data = ~(raw_column(rev_col).isna() & raw_column(opex_col).isna() & raw_column(cash_col).isna()).to_numpy()
+
+    # Field order here is the key order of the legacy row dicts
+    values = {
+        "revenue": numeric_column(rev_col),
+        "cogs": numeric_column(cogs_col),
+        "payroll": numeric_column(payroll_col),
+        # To prevent double-counting if file has both generic 'expenses' and 'payroll', we don't assume. 
+        # We just present them raw.
+        "opex": numeric_column(opex_col),
+        "debt_service": numeric_column(debt_col),
+        "capex": numeric_column(invest_col),
+        "ar_balance": numeric_column(ar_col),
+        "ap_balance": numeric_column(ap_col),
+        "cash_balance": numeric_column(cash_col, signed=True),
+    }
+
+    if date_col in columns:
+        month_vals = raw_column(date_col).map(lambda v: str(v).strip()).tolist()
+    else:
+        month_vals = [f"M{idx+1}" for idx in range(len(df))]
+
+    # Skip total rows and rows with no revenue, opex or cash
+    is_total = np.array(['total' in m.lower() for m in month_vals], dtype=bool)
+    is_empty = (values["revenue"] == 0.0) & (values["opex"] == 0.0) & (values["cash_balance"] == 0.0)
+    keep = np.flatnonzero(has_data & ~is_total & ~is_empty)
+
+    # Extract granular line items — keep exact column name but title case it for neatness
+    line_item_cols = [(str(col).strip().title(), _clean_col(raw_column(col)).abs().to_numpy()[keep].tolist()) for col in unmapped_cols]
+    line_items = []
+    for row in range(len(keep)):
+        items = {}
+        for clean_name, col_values in line_item_cols:
+            if col_values[row] != 0.0:
+                items[clean_name] = col_values[row]
+        line_items.append(items)
+
+    columnar = {
+        "month": [month_vals[i] for i in keep],
+        "columns": {name: arr[keep] for name, arr in values.items()},
+        "line_items": line_items,
+    }
+    return {"data": to_legacy_records(columnar), **columnar}
+
+
+def to_legacy_records(columnar: dict) -> list[dict]:
+    """Expand the columnar parse result (month list + dict of float64 arrays + line_items)
+    into the row-oriented list of dicts that the API and older callers consume."""
+    fields = {name: arr.tolist() for name, arr in columnar["columns"].items()}
+    return [
+        {"month": month, **{name: vals[i] for name, vals in fields.items()}, "line_items": columnar["line_items"][i]}
+        for i, month in enumerate(columnar["month"])
+    ]
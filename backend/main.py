@@ -1,9 +1,10 @@
 from fastapi import FastAPI, UploadFile, File, Form, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from typing import List, Dict, Optional
+import contextlib
 import os
-import io
 import json
+import re
 import pandas as pd
 import numpy as np
 
@@ -14,10 +15,52 @@ from algorithms import (
     multiple_linear_regression_forecast,
     percent_of_sales,
     straight_line_forecast,
-    compute_advance_tax_schedule,
+    advance_tax_schedule_array,
     INDIAN_FY_MONTHS
 )
 
+_NON_AMOUNT_RE = re.compile(r'[^\d.]')
+_NON_AMOUNT_BUFFER_RE = re.compile(r'[^\d.\n]')  # same, but keeps the newline cell separators
+
+def _clean_amount_column(col: pd.Series) -> pd.Series:
+    """Strip currency symbols / separators from a Dr/Cr column and cast to float (bad cells -> 0).
+
+    Already-numeric columns skip the string round-trip (stripping '-' was an abs()).
+    Otherwise the column is joined into one newline-separated buffer so the regex runs
+    once in C instead of once per cell; newlines inside a cell would misalign the split,
+    so that (rare) case falls back to the per-cell str.replace.
+    """
+    if pd.api.types.is_numeric_dtype(col) and not pd.api.types.is_bool_dtype(col):
+        if pd.api.types.is_extension_array_dtype(col):
+            col = col.astype('float64')  # nullable Int64/Float64: <NA> -> NaN, like the NumPy dtypes
+        return col.abs().fillna(0)
+    cells = col.astype(str)
+    parts = _NON_AMOUNT_BUFFER_RE.sub('', '\n'.join(cells)).split('\n')
+    if len(parts) != len(cells):
+        parts = cells.str.replace(_NON_AMOUNT_RE, '', regex=True)
+    values = pd.to_numeric(pd.Series(parts, dtype=object), errors='coerce').to_numpy()
+    return pd.Series(values, index=col.index).fillna(0)
+
+@contextlib.contextmanager
+def _open_table(upload, filename: str):
+    """Yield a read_table(**read_kwargs) callable over the uploaded CSV / workbook.
+
+    One ExcelFile serves every read, so the workbook is unzipped and its shared-strings
+    table parsed once rather than per pd.read_excel call; it is closed on exit so openpyxl
+    releases its zip handle on the upload.
+    """
+    if filename.endswith(".csv"):
+        def read_table(**kwargs):
+            upload.seek(0)
+            return pd.read_csv(upload, **kwargs)
+        yield read_table
+    else:
+        with pd.ExcelFile(upload) as xls:
+            yield xls.parse
+
+# Every AI-extracted amount except the (signed) cash balance is forced positive
+AI_UNSIGNED_FIELDS = ("revenue", "cogs", "opex", "payroll", "debt_service", "capex", "ar_balance", "ap_balance")
+
 app = FastAPI(title="FinCast Engine", description="Forecasting Engine with AI Normalization")
 
 app.add_middleware(
@@ -40,7 +83,10 @@ async def analyze_file(
     if not file.filename.endswith(('.csv', '.xlsx', '.xls')):
         raise HTTPException(status_code=400, detail="Only CSV or Excel files supported")
         
-    contents = await file.read()
+    # The upload stays in Starlette's SpooledTemporaryFile (rolled to disk past 1 MB): pandas reads
+    # it in place, and the raw bytes are only pulled into memory when the local/AI parsers need them.
+    upload = file.file
+    contents = None
     
     # Parse CA Assumptions
     ca_overrides = {}
@@ -52,51 +98,61 @@ async def analyze_file(
             
     try:
         # Fallback raw data handler for Tally-style Vouchers
-        if file.filename.endswith(".csv"):
-            df = pd.read_csv(io.BytesIO(contents))
-        else:
-            df = pd.read_excel(io.BytesIO(contents))
+        # Only the header row is needed to spot one; the full frame is parsed just for those,
+        # since every other upload is re-read headerless by local_fallback_parse below.
+        with _open_table(upload, file.filename) as read_table:
+            header = read_table(nrows=0)
+            
+            # Lower-case the header once; detection and every column lookup below scan these pairs
+            columns_lower = [(str(c).lower(), c) for c in header.columns]
+        
+            def find_column(*keywords):
+                return next((c for name, c in columns_lower if any(kw in name for kw in keywords)), None)
+        
+            # Detect if it's a Tally/Transaction export (Debit/Credit/Date) and auto-aggregate to Months
+            is_transactional = find_column("debit", "credit", "dr/cr") is not None
+            data = []
+        
+            if is_transactional:
+                # We must group by Month and sum Debits vs Credits to get P&L equivalents
+                date_col = find_column('date')
+                if date_col is None:
+                    date_col = header.columns[0]
             
-        columns_lower = [str(c).lower() for c in df.columns]
-        
-        # Detect if it's a Tally/Transaction export (Debit/Credit/Date) and auto-aggregate to Months
-        is_transactional = any("debit" in c or "credit" in c or "dr/cr" in c for c in columns_lower)
-        data = []
-        
-        if is_transactional:
-            # We must group by Month and sum Debits vs Credits to get P&L equivalents
-            date_col = next((c for c in df.columns if 'date' in str(c).lower()), df.columns[0])
-            try:
-                # Convert messy dates to periods
-                df['month_period'] = pd.to_datetime(df[date_col], errors='coerce').dt.to_period('M')
-                df = df.dropna(subset=['month_period'])
-                
                 # Identify debit vs credit columns
-                credit_col = next((c for c in df.columns if 'credit' in str(c).lower()), None)
-                debit_col = next((c for c in df.columns if 'debit' in str(c).lower()), None)
-                part_col = next((c for c in df.columns if 'particular' in str(c).lower() or 'desc' in str(c).lower()), None)
-                
-                # Default mapping logic
-                if credit_col and debit_col:
-                    # Clean the numbers
-                    df[credit_col] = pd.to_numeric(df[credit_col].astype(str).str.replace(r'[^\d.]', '', regex=True), errors='coerce').fillna(0)
-                    df[debit_col] = pd.to_numeric(df[debit_col].astype(str).str.replace(r'[^\d.]', '', regex=True), errors='coerce').fillna(0)
+                credit_col = find_column('credit')
+                debit_col = find_column('debit')
+                try:
+                    # Default mapping logic
+                    if credit_col and debit_col:
+                        # Only the date / Cr / Dr columns are materialised: narration and ledger-name
+                        # columns in Tally exports are the bulk of the object-dtype strings.
+                        # (Positions, since Excel headers can be ints that usecols would read as positions.)
+                        usecols = sorted({header.columns.get_loc(c) for c in (date_col, credit_col, debit_col)})
+                        df = read_table(usecols=usecols)
                     
-                    # Group chronologically
-                    monthly = df.groupby('month_period').agg({credit_col: 'sum', debit_col: 'sum'}).reset_index()
-                    monthly = monthly.sort_values('month_period')
+                        # Convert messy dates to periods
+                        df['month_period'] = pd.to_datetime(df[date_col], errors='coerce').dt.to_period('M')
+                        df = df.dropna(subset=['month_period'])
                     
-                    # Accumulate cash assuming opening was ~100k or just track delta
-                    cash = 100000 
+                        # Clean the numbers
+                        df[credit_col] = _clean_amount_column(df[credit_col])
+                        df[debit_col] = _clean_amount_column(df[debit_col])
+                    
+                        # Group chronologically
+                        monthly = df.groupby('month_period').agg({credit_col: 'sum', debit_col: 'sum'}).reset_index()
+                        monthly = monthly.sort_values('month_period')
+                    
+                        # Accumulate cash assuming opening was ~100k or just track delta
+                        cash = 100000 
                     
-                    for _, row in monthly.iterrows():
                         # Simplification: Credits = Revenue (for SMEs usually), Debits = OpEx/COGS
-                        rev = float(row[credit_col])
-                        exp = float(row[debit_col])
-                        
-                        cash = cash + rev - exp
-                        data.append({
-                            "month": str(row['month_period']),
+                        rev = monthly[credit_col].astype(float)
+                        exp = monthly[debit_col].astype(float)
+                    
+                        # Whole-column arithmetic + one to_dict instead of boxing every month through iterrows
+                        data = pd.DataFrame({
+                            "month": monthly['month_period'].astype(str),
                             "revenue": rev,
                             "cogs": exp * 0.4, # proxy split 
                             "opex": exp * 0.6,
@@ -105,16 +161,18 @@ async def analyze_file(
                             "capex": 0,
                             "ap_balance": 0,
                             "ar_balance": rev * 0.15, 
-                            "cash_balance": cash
-                        })
-                else:
-                    raise Exception("Missing debit/credit columns in transactional data")
-            except Exception as e:
-                # If transaction logic fails, fallback to standard NLP parser
-                pass
+                            "cash_balance": cash + (rev - exp).cumsum()
+                        }).to_dict(orient='records')
+                    else:
+                        raise Exception("Missing debit/credit columns in transactional data")
+                except Exception as e:
+                    # If transaction logic fails, fallback to standard NLP parser
+                    pass
 
         # If data is still empty (Wasn't transactional, or transactional logic failed)
         if not data:
+            await file.seek(0)
+            contents = await file.read()
             structured_data = local_fallback_parse(contents, file.filename)
             data = structured_data["data"]
             
@@ -127,23 +185,17 @@ async def analyze_file(
                 try:
                     from parser import parse_financials
                     print(f"[FALLBACK] local_parser extracted {len(data)} months. Trying AI parser...")
+                    if contents is None:
+                        await file.seek(0)
+                        contents = await file.read()
                     ai_result = await parse_financials(contents, file.filename)
                     if ai_result and len(ai_result.data) >= 3:
-                        data = []
-                        for m in ai_result.data:
-                            data.append({
-                                "month": m.month,
-                                "revenue": abs(m.revenue),
-                                "cogs": abs(m.cogs),
-                                "opex": abs(m.opex),
-                                "payroll": abs(m.payroll),
-                                "debt_service": abs(m.debt_service),
-                                "capex": abs(m.capex),
-                                "ar_balance": abs(m.ar_balance),
-                                "ap_balance": abs(m.ap_balance),
-                                "cash_balance": m.cash_balance,
-                                "line_items": {k: abs(v) for k, v in m.line_items.items()}
-                            })
+                        # One pydantic-core dump of the whole result instead of an attribute read per field;
+                        # FinancialMonth declares its fields in the same order as our row dicts
+                        data = ai_result.model_dump()["data"]
+                        for row in data:
+                            row.update({k: abs(row[k]) for k in AI_UNSIGNED_FIELDS})
+                            row["line_items"] = {k: abs(v) for k, v in row["line_items"].items()}
                         ai_fallback_used = True
                         print(f"[FALLBACK] AI parser extracted {len(data)} months successfully.")
                 except Exception as parse_err:
@@ -157,12 +209,14 @@ async def analyze_file(
                 )
             
         # Extract and compute timeseries averages for the new deep metrics
-        revenues = [d.get("revenue", 0) for d in data]
-        cogs_arr = [d.get("cogs", 0) for d in data]
-        opex_arr = [d.get("opex", 0) for d in data]
-        payroll_arr = [d.get("payroll", 0) for d in data]
-        debt_arr = [d.get("debt_service", 0) for d in data]
-        capex_arr = [d.get("capex", 0) for d in data]
+        # One DataFrame over the rows instead of a list comprehension per field (absent -> 0)
+        hist = pd.DataFrame(data, columns=["revenue", "cogs", "opex", "payroll", "debt_service", "capex"]).fillna(0)
+        revenues = hist["revenue"].to_numpy(dtype=np.float64)
+        cogs_arr = hist["cogs"].to_numpy(dtype=np.float64)
+        opex_arr = hist["opex"].to_numpy(dtype=np.float64)
+        payroll_arr = hist["payroll"].to_numpy(dtype=np.float64)
+        debt_arr = hist["debt_service"].to_numpy(dtype=np.float64)
+        capex_arr = hist["capex"].to_numpy(dtype=np.float64)
         
         # We need absolute metrics for the most recent month for the Bridge Analysis
         rm = data[-1]
@@ -172,9 +226,9 @@ async def analyze_file(
         current_ar = rm.get("ar_balance", 0)
         current_ap = rm.get("ap_balance", 0)
         
-        avg_dso = countback_dso(current_ar, list(reversed(revenues)))
+        avg_dso = countback_dso(current_ar, revenues[::-1])
         # Simulated DPO = AP / (average COGS/365)
-        avg_monthly_cogs = sum(cogs_arr)/len(cogs_arr) if cogs_arr else 0
+        avg_monthly_cogs = float(cogs_arr.mean()) if len(cogs_arr) else 0
         calc_dpo = (current_ap / (avg_monthly_cogs * 12)) * 365 if avg_monthly_cogs > 0 else 0
         
         # Calculate profitability
@@ -200,7 +254,7 @@ async def analyze_file(
             if val:
                 manual_growth = float(val) / 100.0
                 baseline_forecast = []
-                base = revenues[-1] if revenues else 0
+                base = float(revenues[-1]) if len(revenues) else 0
                 for _ in range(12):
                     base *= (1 + manual_growth)
                     baseline_forecast.append(max(0, base))
@@ -228,14 +282,11 @@ async def analyze_file(
         
         # Calculate percent of total OpEx for each granular line item
         line_item_pcts = {}
-        total_opex_historical = sum(opex_arr)
+        total_opex_historical = float(opex_arr.sum())
         if total_opex_historical > 0:
-            hist_line_item_sums = {}
-            for d in data:
-                for k, v in d.get("line_items", {}).items():
-                    hist_line_item_sums[k] = hist_line_item_sums.get(k, 0) + v
-            for k, total_val in hist_line_item_sums.items():
-                line_item_pcts[k] = total_val / total_opex_historical
+            # One months × items frame summed column-wise instead of a dict update per cell
+            li_df = pd.DataFrame([d.get("line_items", {}) for d in data]).fillna(0)
+            line_item_pcts = (li_df.sum(axis=0) / total_opex_historical).to_dict()
         
         capex_forecast = straight_line_forecast(capex_arr, periods=12)
         debt_forecast = straight_line_forecast(debt_arr, periods=12)
@@ -247,124 +298,117 @@ async def analyze_file(
         end_cash = rm.get("cash_balance", 0)
         running_cash = round(end_cash)
         
-        # --- PHASE 1: Compute raw EBT for all 12 months (needed for annual tax estimate) ---
-        monthly_ebt = []
-        for i, val in enumerate(baseline_forecast):
-            proj_rev = val
-            proj_cogs = proj_rev * cogs_pct
-            proj_gp = proj_rev - proj_cogs
-            proj_opex = proj_rev * opex_pct
-            proj_payroll = proj_rev * payroll_pct
-            proj_ebitda = proj_gp - proj_opex - proj_payroll
-            proj_debt = debt_forecast[i]
-            proj_capex = capex_forecast[i] + (custom_capex / 12)
-            proj_net_profit = proj_ebitda - proj_debt - proj_capex
-            monthly_ebt.append(proj_net_profit)
+        # --- PHASE 1: Project the P&L for all 12 months in one vectorised pass ---
+        # EBT feeds the annual tax estimate and is reused unchanged by the 3-Way Model below.
+        proj_rev = np.asarray(baseline_forecast, dtype=np.float64)
+        proj_cogs = proj_rev * cogs_pct
+        proj_gp = proj_rev - proj_cogs
+        proj_opex = proj_rev * opex_pct
+        proj_payroll = proj_rev * payroll_pct
+        proj_ebitda = proj_gp - proj_opex - proj_payroll
+        
+        proj_debt = np.asarray(debt_forecast, dtype=np.float64)
+        proj_capex = np.asarray(capex_forecast, dtype=np.float64) + (custom_capex / 12)
+        
+        proj_net_profit = proj_ebitda - proj_debt - proj_capex
         
         # --- PHASE 2: Compute Indian Advance Tax Schedule (Section 211) ---
         # Tax is NOT spread evenly — it hits only in Jun(M3), Sep(M6), Dec(M9), Mar(M12)
         # with statutory percentages: 15%, 30%, 30%, 25% of estimated annual liability
-        advance_tax_monthly = compute_advance_tax_schedule(monthly_ebt, custom_tax_rate)
+        proj_tax = advance_tax_schedule_array(proj_net_profit, custom_tax_rate)
         
-        estimated_annual_tax = sum(advance_tax_monthly)
+        estimated_annual_tax = float(proj_tax.sum())
         advance_tax_exempt = estimated_annual_tax < 10000  # Section 208 threshold
         
         # Calculate working capital ratios for Indirect Method Cash Flow
-        last_rev = revenues[-1] if revenues and revenues[-1] > 0 else 1
+        last_rev = revenues[-1] if len(revenues) and revenues[-1] > 0 else 1
         ar_pct = current_ar / last_rev
         last_costs = (cogs_arr[-1] + opex_arr[-1] + payroll_arr[-1])
         last_costs = last_costs if last_costs > 0 else 1
         ap_pct = current_ap / last_costs
         
-        prev_ar = current_ar
-        prev_ap = current_ap
-        
         # --- PHASE 3: Build the full 3-Way Model with correct tax scheduling ---
-        for i, val in enumerate(baseline_forecast):
-            proj_rev = val
-            proj_cogs = proj_rev * cogs_pct
-            proj_gp = proj_rev - proj_cogs
-            proj_opex = proj_rev * opex_pct
-            proj_payroll = proj_rev * payroll_pct
-            proj_ebitda = proj_gp - proj_opex - proj_payroll
-            
-            proj_debt = debt_forecast[i]
-            proj_capex = capex_forecast[i] + (custom_capex / 12)
-            
-            proj_net_profit = proj_ebitda - proj_debt - proj_capex
-            
-            # --- INDIRECT METHOD CASH FLOW (Schedule III) ---
-            # 1. Operating Profit before Working Capital Changes
-            operating_profit_bwc = proj_ebitda
-            
-            # 2. Adjustments for Working Capital
-            proj_ar = proj_rev * ar_pct
-            proj_ap = (proj_cogs + proj_opex + proj_payroll) * ap_pct
-            
-            delta_ar = proj_ar - prev_ar  # Increase in AR is an outflow
-            delta_ap = proj_ap - prev_ap  # Increase in AP is an inflow
-            
-            prev_ar = proj_ar
-            prev_ap = proj_ap
-            
-            # 3. Cash Generated from Operations
-            cash_from_operations = operating_profit_bwc + delta_ap - delta_ar
-            
-            # 4. Less Taxes Paid
-            proj_tax = advance_tax_monthly[i]
-            net_cash_operating = cash_from_operations - proj_tax
-            
-            # 5. Cash Flow from Investing
-            net_cash_investing = -proj_capex
-            
-            # 6. Cash Flow from Financing
-            net_cash_financing = -proj_debt
-            
-            # Total Net Cash Flow
-            cf_month = net_cash_operating + net_cash_investing + net_cash_financing
-            rounded_cf_month = round(cf_month)
-            running_cash += rounded_cf_month
-            # Use Indian FY month labels (Apr-Mar) instead of generic M1-M12
-            month_label = INDIAN_FY_MONTHS[i] if i < len(INDIAN_FY_MONTHS) else f"M{i+1}"
-            
-            # Forecast Granular Line Items proportional to forecasted OpEx
-            proj_line_items = {}
-            for k, pct in line_item_pcts.items():
-                proj_line_items[k] = round(proj_opex * pct)
-
-            three_way_model.append({
-                "month": month_label,
-                "revenue": round(proj_rev),
-                "cogs": round(proj_cogs),
-                "opex": round(proj_opex),
-                "payroll": round(proj_payroll),
-                "capex": round(proj_capex),
-                "debt": round(proj_debt),
-                "ebitda": round(proj_ebitda),
-                "net_profit": round(proj_net_profit),
-                "tax_liability": round(proj_tax),
-                "operating_profit_bwc": round(operating_profit_bwc),
-                "delta_ar": round(delta_ar),
-                "delta_ap": round(delta_ap),
-                "cash_from_operations": round(cash_from_operations),
-                "net_cash_operating": round(net_cash_operating),
-                "net_cash_investing": round(net_cash_investing),
-                "net_cash_financing": round(net_cash_financing),
-                "net_cash_flow": rounded_cf_month,
-                "ending_cash": running_cash,
-                "is_tax_quarter": proj_tax > 0,
-                "line_items": proj_line_items
+        # --- INDIRECT METHOD CASH FLOW (Schedule III) ---
+        # 1. Operating Profit before Working Capital Changes
+        operating_profit_bwc = proj_ebitda
+        
+        # 2. Adjustments for Working Capital
+        proj_ar = proj_rev * ar_pct
+        proj_ap = (proj_cogs + proj_opex + proj_payroll) * ap_pct
+        
+        delta_ar = np.diff(proj_ar, prepend=current_ar)  # Increase in AR is an outflow
+        delta_ap = np.diff(proj_ap, prepend=current_ap)  # Increase in AP is an inflow
+        
+        # 3. Cash Generated from Operations
+        cash_from_operations = operating_profit_bwc + delta_ap - delta_ar
+        
+        # 4. Less Taxes Paid
+        net_cash_operating = cash_from_operations - proj_tax
+        
+        # 5. Cash Flow from Investing
+        net_cash_investing = -proj_capex
+        
+        # 6. Cash Flow from Financing
+        net_cash_financing = -proj_debt
+        
+        # Total Net Cash Flow
+        cf_month = net_cash_operating + net_cash_investing + net_cash_financing
+        
+        # Store confidence cones for charting
+        decay_factor = 1 + (0.02 * np.arange(len(proj_rev)))
+        cone_lower = np.maximum(0, proj_rev * (1 - (0.08 * decay_factor)))
+        cone_upper = proj_rev * (1 + (0.08 * decay_factor))
+        
+        # Use Indian FY month labels (Apr-Mar) instead of generic M1-M12
+        month_labels = [INDIAN_FY_MONTHS[i] if i < len(INDIAN_FY_MONTHS) else f"M{i+1}" for i in range(len(proj_rev))]
+        
+        model_columns = {
+            "revenue": proj_rev,
+            "cogs": proj_cogs,
+            "opex": proj_opex,
+            "payroll": proj_payroll,
+            "capex": proj_capex,
+            "debt": proj_debt,
+            "ebitda": proj_ebitda,
+            "net_profit": proj_net_profit,
+            "tax_liability": proj_tax,
+            "operating_profit_bwc": operating_profit_bwc,
+            "delta_ar": delta_ar,
+            "delta_ap": delta_ap,
+            "cash_from_operations": cash_from_operations,
+            "net_cash_operating": net_cash_operating,
+            "net_cash_investing": net_cash_investing,
+            "net_cash_financing": net_cash_financing,
+            "net_cash_flow": cf_month,
+        }
+        # Every reported figure is rounded by one np.rint over a stacked (series × months) matrix;
+        # the transpose hands back each month's values as one list
+        n_model = len(model_columns)
+        rounded = np.rint(np.vstack([*model_columns.values(), cone_lower, cone_upper])).astype(np.int64)
+        model_rows = rounded[:n_model].T.tolist()
+        lower, upper = rounded[n_model:].tolist()
+        ending_cash = (running_cash + np.cumsum(rounded[n_model - 1])).tolist()
+        is_tax_quarter = (proj_tax > 0).tolist()
+        
+        # Forecast Granular Line Items proportional to forecasted OpEx
+        # (12 months × K items) in one outer product, rows zipped back onto the item names
+        line_item_names = list(line_item_pcts)
+        line_item_matrix = np.rint(np.outer(proj_opex, list(line_item_pcts.values()))).astype(np.int64).tolist()
+        
+        for i, month_label in enumerate(month_labels):
+            row = {"month": month_label, **dict(zip(model_columns, model_rows[i]))}
+            row.update({
+                "ending_cash": ending_cash[i],
+                "is_tax_quarter": is_tax_quarter[i],
+                "line_items": dict(zip(line_item_names, line_item_matrix[i]))
             })
+            three_way_model.append(row)
             
-            # Store confidence cones for charting
-            decay_factor = 1 + (0.02 * i) 
-            lower = val * (1 - (0.08 * decay_factor))
-            upper = val * (1 + (0.08 * decay_factor))
             area_chart_data.append({
                 "month": month_label, 
-                "baseline": round(val), 
-                "lower": round(max(0, lower)), 
-                "upper": round(upper)
+                "baseline": row["revenue"], 
+                "lower": lower[i], 
+                "upper": upper[i]
             })
             
         start_cash = data[-2].get("cash_balance", 0) if len(data) >= 2 else 0
@@ -391,7 +435,7 @@ async def analyze_file(
         return {
             "status": "success",
             "kpis": {
-                "projected_12m": round(sum(baseline_forecast)),
+                "projected_12m": round(float(proj_rev.sum())),
                 "geo_growth_rate": round(geo_growth * 100, 2),
                 "calculated_dso": round(avg_dso, 1),
                 "calculated_dpo": round(calc_dpo, 1),
@@ -1,11 +1,11 @@
 import os
 import json
 import io
+import hashlib
+import functools
+from collections import OrderedDict
 import pandas as pd
 from pydantic import BaseModel, Field
-from langchain_core.prompts import PromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.output_parsers import PydanticOutputParser
 from typing import List
 
 class FinancialMonth(BaseModel):
@@ -24,13 +24,7 @@ class FinancialMonth(BaseModel):
 class ExtractedFinancials(BaseModel):
     data: List[FinancialMonth] = Field(description="Chronological list of extracted monthly financials")
 
-# Make sure GOOGLE_API_KEY is in your environment
-llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash", temperature=0)
-
-parser = PydanticOutputParser(pydantic_object=ExtractedFinancials)
-
-prompt = PromptTemplate(
-    template="""You are a highly expert forensic accountant AI specializing in Indian SME financials.
+PROMPT_TEMPLATE = """You are a highly expert forensic accountant AI specializing in Indian SME financials.
 Extract monthly financial metrics from the messy spreadsheet data provided.
 
 For EACH month, extract:
@@ -57,16 +51,47 @@ Format instructions:
 
 Raw Messy Spreadsheet Data:
 {messy_data}
-""",
-    input_variables=["messy_data"],
-    partial_variables={"format_instructions": parser.get_format_instructions()},
-)
+"""
+
+@functools.lru_cache(maxsize=1)
+def get_chain():
+    """Build the Gemini extraction chain on first use.
+
+    langchain + langchain_google_genai take hundreds of ms to import, and this module is
+    only reached when local parsing falls short, so nothing is imported or constructed
+    until a file actually needs the AI parser.
+    """
+    from langchain_core.prompts import PromptTemplate
+    from langchain_core.output_parsers import PydanticOutputParser
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    # Make sure GOOGLE_API_KEY is in your environment
+    llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash", temperature=0)
+    
+    parser = PydanticOutputParser(pydantic_object=ExtractedFinancials)
+    
+    prompt = PromptTemplate(
+        template=PROMPT_TEMPLATE,
+        input_variables=["messy_data"],
+        partial_variables={"format_instructions": parser.get_format_instructions()},
+    )
+    
+    return prompt | llm | parser
 
-chain = prompt | llm | parser
+# Extractions keyed by SHA-256 of the upload: CAs re-submit the same file while tweaking
+# assumptions, and hashing it costs nothing next to a multi-second Gemini round-trip.
+PARSE_CACHE_MAX_ENTRIES = 64
+_parse_cache = OrderedDict()
 
 async def parse_financials(file_bytes: bytes, filename: str) -> ExtractedFinancials:
     """Takes a messy file, reads primitive text, uses Gemini to normalize perfectly"""
     
+    cache_key = hashlib.sha256(file_bytes).hexdigest() + os.path.splitext(filename)[1].lower()
+    cached = _parse_cache.get(cache_key)
+    if cached is not None:
+        _parse_cache.move_to_end(cache_key)
+        return cached.model_copy(deep=True)
+    
     # Try reading as CSV or Excel
     try:
         if filename.endswith(".csv"):
@@ -74,16 +99,21 @@ async def parse_financials(file_bytes: bytes, filename: str) -> ExtractedFinanci
         else:
             df = pd.read_excel(io.BytesIO(file_bytes))
             
-        # Convert df to a raw string format that the LLM can easily read
-        # E.g., Markdown table or simple string
-        messy_data = df.to_string()
+        # Convert df to a raw string format that the LLM can easily read.
+        # CSV rather than df.to_string(): no column-alignment padding, so the same sheet costs
+        # roughly a third fewer characters to tokenize, and pandas writes it without per-cell formatting.
+        messy_data = df.to_csv(index=False)
         
         # In reality, this data might exceed standard context limits if it's huge, 
-        # but Gemini 1.5 flash has a massive 1M token window, so dumping df.to_string() is fine.
-        result = await chain.ainvoke({"messy_data": messy_data[:200000]}) # limit raw string size just in case
+        # but Gemini 1.5 flash has a massive 1M token window, so dumping the CSV is fine.
+        result = await get_chain().ainvoke({"messy_data": messy_data[:200000]}) # limit raw string size just in case
         
         # Sort chronologically just to be safe
         result.data.sort(key=lambda x: x.month)
+        
+        _parse_cache[cache_key] = result.model_copy(deep=True)
+        while len(_parse_cache) > PARSE_CACHE_MAX_ENTRIES:
+            _parse_cache.popitem(last=False)
         return result
         
     except Exception as e:
@@ -5,80 +5,52 @@ to test the full Schedule III pipeline (Steps 1-4).
 import pandas as pd
 import numpy as np
 
-np.random.seed(42)
+rng = np.random.default_rng(42)
 
-months = pd.date_range(start="2024-04-01", periods=12, freq="MS").strftime("%b-%y").tolist()
-
-revenue = []
-cogs = []
-opex = []
-payroll = []
-ar = []
-ap = []
-cash = []
-
-# Granular line items — these should survive the local_parser unmapped columns logic
-marketing = []
-rent = []
-software = []
-office_supplies = []
-travel = []
+n_months = 12
+months = pd.date_range(start="2024-04-01", periods=n_months, freq="MS").strftime("%b-%y").tolist()
 
 base_rev = 800000
 trend = 20000
-seasonality = [0.9, 0.95, 1.0, 1.1, 1.25, 1.3, 1.2, 1.05, 0.95, 0.85, 0.9, 0.9]
+seasonality = np.array([0.9, 0.95, 1.0, 1.1, 1.25, 1.3, 1.2, 1.05, 0.95, 0.85, 0.9, 0.9])
 
-current_cash = 250000
+# Every month is generated at once — one sized draw per series instead of a scalar draw per month
+i = np.arange(n_months)
+r = (base_rev + trend * i) * seasonality[i % 12] + rng.normal(0, 15000, n_months)
 
-for i in range(12):
-    month_idx = i % 12
-    r = base_rev + (trend * i)
-    r = r * seasonality[month_idx]
-    r = r + np.random.normal(0, 15000)
+c = r * rng.uniform(0.35, 0.40, n_months)
+p = r * rng.uniform(0.18, 0.22, n_months)
+o = r * rng.uniform(0.10, 0.15, n_months)
 
-    c = r * np.random.uniform(0.35, 0.40)
-    p = r * np.random.uniform(0.18, 0.22)
-    o = r * np.random.uniform(0.10, 0.15)
-    
-    # Granular expenses (these should NOT get mapped by _get_mapped_column)
-    mkt = r * np.random.uniform(0.03, 0.05)
-    rnt = np.random.uniform(45000, 55000)  # Fixed rent
-    sw  = np.random.uniform(15000, 25000)  # SaaS subscriptions  
-    ofs = np.random.uniform(5000, 12000)   # Office supplies
-    trv = r * np.random.uniform(0.01, 0.02)  # Travel scales with biz
+# Granular expenses (these should NOT get mapped by _get_mapped_column)
+mkt = r * rng.uniform(0.03, 0.05, n_months)
+rnt = rng.uniform(45000, 55000, n_months)  # Fixed rent
+sw  = rng.uniform(15000, 25000, n_months)  # SaaS subscriptions  
+ofs = rng.uniform(5000, 12000, n_months)   # Office supplies
+trv = r * rng.uniform(0.01, 0.02, n_months)  # Travel scales with biz
 
-    ar_bal = r * 1.2
-    ap_bal = c * 0.8
+ar_bal = r * 1.2
+ap_bal = c * 0.8
 
-    current_cash += (r - c - p - o - mkt - rnt - sw - ofs - trv) * 0.8
+current_cash = 250000 + np.cumsum((r - c - p - o - mkt - rnt - sw - ofs - trv) * 0.8)
 
-    revenue.append(max(0, round(r)))
-    cogs.append(max(0, round(c)))
-    payroll.append(max(0, round(p)))
-    opex.append(max(0, round(o)))
-    marketing.append(max(0, round(mkt)))
-    rent.append(max(0, round(rnt)))
-    software.append(max(0, round(sw)))
-    office_supplies.append(max(0, round(ofs)))
-    travel.append(max(0, round(trv)))
-    ar.append(max(0, round(ar_bal)))
-    ap.append(max(0, round(ap_bal)))
-    cash.append(max(0, round(current_cash)))
+def clip_round(values):
+    return np.maximum(0, np.rint(values)).astype(int)
 
 df = pd.DataFrame({
     'Month': months,
-    'Revenue': revenue,
-    'COGS': cogs,
-    'Payroll': payroll,
-    'OPEX': opex,
-    'Marketing': marketing,
-    'Rent': rent,
-    'Software Subscriptions': software,
-    'Office Supplies': office_supplies,
-    'Travel': travel,
-    'Receivable': ar,
-    'Payable': ap,
-    'Cash Balance': cash
+    'Revenue': clip_round(r),
+    'COGS': clip_round(c),
+    'Payroll': clip_round(p),
+    'OPEX': clip_round(o),
+    'Marketing': clip_round(mkt),
+    'Rent': clip_round(rnt),
+    'Software Subscriptions': clip_round(sw),
+    'Office Supplies': clip_round(ofs),
+    'Travel': clip_round(trv),
+    'Receivable': clip_round(ar_bal),
+    'Payable': clip_round(ap_bal),
+    'Cash Balance': clip_round(current_cash)
 })
 
 df.to_csv("granular_test_data.csv", index=False)